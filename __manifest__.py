@@ -65,6 +65,7 @@ Requirements:
         # Data
         'data/rental_sequence.xml',
         'data/rental_data.xml',
+        'data/rental_cron.xml',
         
         # Views - QR Features
         'views/qr_scanner_views.xml',
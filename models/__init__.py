@@ -7,6 +7,7 @@
 
 # STEP 1: Import utility modules (no Odoo model dependencies)
 from . import qr_generator  # Pure utility - no model imports
+from . import late_fee_kernel  # Pure utility - no model imports
 
 # STEP 2: Import base models (no dependencies on other rental models)
 from . import rental_equipment_category  # No dependencies
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# """
+# Late Fee Kernel
+# Pure arithmetic shared by the per-project compute and the nightly overdue sweep
+# """
+
+
+def compute_late_fees(subtotals, days, daily_rate, percentage, method='maximum'):
+    """
+    Compute late fees for parallel sequences of rental amounts and overdue days.
+
+    The calculation method is resolved once, outside the loop, so each branch
+    is a single tight comprehension with no per-row dispatch.
+
+    Args:
+        subtotals (list): Rental amount of each project
+        days (list): Days overdue of each project (0 or less means not overdue)
+        daily_rate (float): Fixed amount charged per overdue day
+        percentage (float): Percentage of the rental amount charged per overdue day
+        method (str): 'daily', 'percentage' or 'maximum'
+
+    Returns:
+        list: Late fee of each project
+    """
+    rate = percentage / 100.0
+
+    if method == 'daily':
+        return [daily_rate * d if d > 0 else 0.0 for d in days]
+
+    if method == 'percentage':
+        return [s * rate * d if d > 0 else 0.0 for s, d in zip(subtotals, days)]
+
+    return [
+        max(daily_rate * d, s * rate * d) if d > 0 else 0.0
+        for s, d in zip(subtotals, days)
+    ]
@@ -10,6 +10,7 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from collections import Counter
 
 
 class RentalEquipment(models.Model):
@@ -110,10 +111,12 @@ class RentalEquipment(models.Model):
         for equipment in self:
             if equipment.has_serials:
                 serials = equipment.serial_ids
+                # Count every status in a single pass
+                status_counts = Counter(serials.mapped('status'))
                 equipment.total_stock = len(serials)
-                equipment.available_stock = len(serials.filtered(lambda s: s.status == 'available'))
-                equipment.reserved_stock = len(serials.filtered(lambda s: s.status == 'reserved'))
-                equipment.rented_stock = len(serials.filtered(lambda s: s.status == 'rented'))
+                equipment.available_stock = status_counts['available']
+                equipment.reserved_stock = status_counts['reserved']
+                equipment.rented_stock = status_counts['rented']
             else:
                 # For non-serialized items, set to 0 or implement quantity-based logic
                 equipment.total_stock = 0
@@ -199,10 +202,13 @@ class RentalEquipment(models.Model):
             # For non-serialized items, simple stock check
             return self.available_stock >= quantity
         
-        # For serialized items, check available serials
-        available_serials = self.serial_ids.filtered(lambda s: s.status == 'available')
+        # For serialized items, count available serials (no need to count past quantity)
+        available_count = self.env['rental.equipment.serial'].search_count([
+            ('equipment_id', '=', self.id),
+            ('status', '=', 'available'),
+        ], limit=quantity)
         
         # TODO: Check if any reserved/rented serials will be available in the date range
         # This requires checking project dates
         
-        return len(available_serials) >= quantity
\ No newline at end of file
+        return available_count >= quantity
\ No newline at end of file
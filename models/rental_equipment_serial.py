@@ -11,13 +11,17 @@
 
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
 
 import base64
+import hashlib
 import logging
 _logger = logging.getLogger(__name__)
 
+# Filename sanitization table: '/' -> '-', ' ' -> '_'
+_QR_FILENAME_TRANS = str.maketrans({'/': '-', ' ': '_'})
+
 class RentalEquipmentSerial(models.Model):
     _name = 'rental.equipment.serial'
     _description = 'Equipment Serial Number'
@@ -126,39 +130,29 @@ class RentalEquipmentSerial(models.Model):
         compute='_compute_qr_code_filename',
         store=True
     )
-
-    @api.model
-    def create(self, vals):
-        """Auto-generate serial number if not provided and equipment has auto-generation enabled"""
-        if not vals.get('serial_number'):
-            equipment = self.env['rental.equipment'].browse(vals.get('equipment_id'))
-            if equipment.auto_generate_serials:
-                # Generate serial: EQUIPMENT_CODE-XXXX
-                code = equipment.code or 'EQ'
-                sequence = len(equipment.serial_ids) + 1
-                vals['serial_number'] = f"{code}-{sequence:04d}"
-        
-        return super().create(vals)
     
-    def write(self, vals):
-        """Track status changes"""
-        result = super().write(vals)
-        
-        # If status changed, log it in history
-        if 'status' in vals:
-            for serial in self:
-                if serial.current_project_id:
-                    # Create status history entry
-                    self.env['rental.project.item.status'].create({
-                        'project_id': serial.current_project_id.id,
-                        'equipment_id': serial.equipment_id.id,
-                        'serial_id': serial.id,
-                        'status': vals['status'],
-                        'notes': f"Status changed to {dict(self._fields['status'].selection).get(vals['status'])}"
-                    })
-        
-        return result
+    qr_code_hash = fields.Char(
+        string='QR Code Payload Hash',
+        readonly=True,
+        copy=False,
+        help='Checksum of the data encoded in the current QR code, used to skip identical regenerations'
+    )
 
+    def init(self):
+        """Composite indexes for the per-project and per-equipment status lookups"""
+        tools.create_index(
+            self._cr,
+            'rental_serial_project_status_idx',
+            self._table,
+            ['current_project_id', 'status']
+        )
+        tools.create_index(
+            self._cr,
+            'rental_serial_equipment_status_idx',
+            self._table,
+            ['equipment_id', 'status']
+        )
+    
     # NEW METHODS - Add these right after write()
     def unlink(self):
         """
@@ -321,8 +315,8 @@ class RentalEquipmentSerial(models.Model):
         """Generate filename for QR code"""
         for record in self:
             if record.serial_number:
-                # Sanitize filename
-                safe_name = str(record.serial_number).replace('/', '-').replace(' ', '_')
+                # Sanitize filename in a single pass
+                safe_name = str(record.serial_number).translate(_QR_FILENAME_TRANS)
                 record.qr_code_filename = f"QR_{safe_name}.png"
             else:
                 record.qr_code_filename = "QR_code.png"
@@ -333,79 +327,123 @@ class RentalEquipmentSerial(models.Model):
         records = super(RentalEquipmentSerial, self).create(vals_list)
         
         # Generate QR codes for all new records
-        for record in records:
-            if record.serial_number:
-                record._generate_qr_code()
+        records._generate_qr_codes_batch()
         
         return records
     
     def write(self, vals):
         """Regenerate QR code if serial number changes"""
+        old_numbers = {}
+        if 'serial_number' in vals:
+            old_numbers = {record.id: record.serial_number for record in self}
+        
         result = super(RentalEquipmentSerial, self).write(vals)
         
-        # Regenerate QR if serial_number changes
-        if 'serial_number' in vals:
-            for record in self:
-                if record.serial_number:
-                    record._generate_qr_code()
+        # Regenerate QR only for records whose serial_number actually changed
+        if old_numbers:
+            changed = self.filtered(lambda r: r.serial_number != old_numbers[r.id])
+            changed._generate_qr_codes_batch()
         
         return result
     
-    def _generate_qr_code(self):
-        """Generate QR code for this serial number"""
-        self.ensure_one()
+    def _get_qr_logo_binary(self):
+        """Return the decoded company QR logo, or None if disabled or unreadable"""
+        company = self.env.company
         
-        if not self.serial_number:
-            _logger.warning(f"Cannot generate QR code: no serial number for record {self.id}")
-            return False
+        # bin_size: test for a logo without loading the attachment content
+        if hasattr(company, 'use_qr_logo') and company.use_qr_logo \
+                and company.with_context(bin_size=True).qr_logo:
+            try:
+                # Decoded once per logo version and reused across batches
+                return self._get_decoded_qr_logo(company.id, company.write_date)
+            except Exception as e:
+                _logger.warning(f"Could not decode company logo: {str(e)}")
+        return None
+    
+    @api.model
+    @tools.ormcache('company_id', 'write_date')
+    def _get_decoded_qr_logo(self, company_id, write_date):
+        """Decoded company QR logo, cached per registry until the company is written"""
+        return base64.b64decode(self.env['res.company'].browse(company_id).qr_logo)
+    
+    def _generate_qr_codes_batch(self):
+        """
+        Generate QR codes for all serials in self.
+        The generator is imported and the company logo decoded once per batch.
+        
+        Returns:
+            rental.equipment.serial: Records whose QR code was generated
+        """
+        records = self.filtered('serial_number')
+        if not records:
+            return self.browse()
         
         try:
             # Import the QR generator
             from . import qr_generator
-            
-            # Get company logo if enabled
-            logo_binary = None
-            company = self.env.company
-            
-            if hasattr(company, 'use_qr_logo') and company.use_qr_logo and company.qr_logo:
-                try:
-                    logo_binary = base64.b64decode(company.qr_logo)
-                except Exception as e:
-                    _logger.warning(f"Could not decode company logo: {str(e)}")
-            
-            # Generate QR code (300x300 pixels)
-            qr_base64 = qr_generator.generate_qr_code(
-                data=str(self.serial_number),
-                logo_binary=logo_binary,
-                size=1080
-            )
-            
-            if qr_base64:
-                # Save to record
-                self.qr_code = qr_base64
-                _logger.info(f"QR code generated successfully for serial: {self.serial_number}")
-                return True
-            else:
-                _logger.error(f"QR code generation failed for serial: {self.serial_number}")
-                return False
-            
         except ImportError as e:
             _logger.error(f"QR generator module not found: {str(e)}")
+            return self.browse()
+        
+        # Get company logo if enabled
+        logo_binary = self._get_qr_logo_binary()
+        company = self.env.company
+        logo_version = f"{company.id}:{company.write_date}" if logo_binary else ''
+        
+        # Records that already have a QR code (bin_size avoids loading the images)
+        with_qr_ids = set(records.with_context(bin_size=True).filtered('qr_code').ids)
+        
+        generated_ids = []
+        for record in records:
+            qr_hash = hashlib.blake2b(
+                f"{record.serial_number}|{logo_version}".encode(),
+                digest_size=8
+            ).hexdigest()
+            
+            # Existing QR code already encodes this payload: nothing to render
+            if record.qr_code_hash == qr_hash and record.id in with_qr_ids:
+                generated_ids.append(record.id)
+                continue
+            
+            try:
+                qr_base64 = qr_generator.generate_qr_code(
+                    data=str(record.serial_number),
+                    logo_binary=logo_binary,
+                    size=1080
+                )
+                
+                if qr_base64:
+                    # Save to record
+                    record.write({
+                        'qr_code': qr_base64,
+                        'qr_code_hash': qr_hash,
+                    })
+                    generated_ids.append(record.id)
+                    _logger.info(f"QR code generated successfully for serial: {record.serial_number}")
+                else:
+                    _logger.error(f"QR code generation failed for serial: {record.serial_number}")
+                    
+            except Exception as e:
+                _logger.error(f"Failed to generate QR code for {record.serial_number}: {str(e)}")
+        
+        return self.browse(generated_ids)
+    
+    def _generate_qr_code(self):
+        """Generate QR code for this serial number"""
+        self.ensure_one()
+        
+        if not self.serial_number:
+            _logger.warning(f"Cannot generate QR code: no serial number for record {self.id}")
             return False
-        except Exception as e:
-            _logger.error(f"Failed to generate QR code for {self.serial_number}: {str(e)}")
-            return False
+        
+        return bool(self._generate_qr_codes_batch())
     
     def action_regenerate_qr_code(self):
         """Manual action to regenerate QR code"""
-        success_count = 0
-        error_count = 0
-        
-        for record in self:
-            if record._generate_qr_code():
-                success_count += 1
-            else:
-                error_count += 1
+        # One batch: generator import and logo lookup happen once for all records
+        generated = self._generate_qr_codes_batch()
+        success_count = len(generated)
+        error_count = len(self) - success_count
         
         if success_count > 0:
             message = f'Successfully regenerated {success_count} QR code(s)'
@@ -428,7 +466,7 @@ class RentalEquipmentSerial(models.Model):
                 'tag': 'display_notification',
                 'params': {
                     'title': _('Error'),
-                    'message': f'Failed to regenerate QR code(s). Check server logs. {record._generate_qr_code()}',
+                    'message': 'Failed to regenerate QR code(s). Check server logs.',
                     'type': 'danger',
                     'sticky': True,
                 }
@@ -13,8 +13,11 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
+from collections import defaultdict
 from datetime import timedelta
 
+from .late_fee_kernel import compute_late_fees
+
 
 class RentalProject(models.Model):
     _name = 'rental.project'
@@ -210,36 +213,52 @@ class RentalProject(models.Model):
                 project.days_overdue = 0
                 project.is_overdue = False
     
-    @api.depends('item_ids.subtotal', 'late_fee_amount', 'damage_fee', 'discount_amount')
-    def _compute_amounts(self):
-        for project in self:
-            project.total_amount = sum(project.item_ids.mapped('subtotal'))
-            project.grand_total = (
-                project.total_amount +
-                project.late_fee_amount +
-                project.damage_fee -
-                project.discount_amount
-            )
-    
-    @api.depends('days_overdue', 'late_fee_enabled', 'total_amount')
-    def _compute_late_fee(self):
+    def _get_late_fee_settings(self):
+        """Return (daily_rate, percentage, method) from system parameters"""
         IrConfigParam = self.env['ir.config_parameter'].sudo()
         daily_rate = float(IrConfigParam.get_param('rental.late_fee_daily_rate', 0))
         percentage = float(IrConfigParam.get_param('rental.late_fee_percentage', 0))
-        
-        for project in self:
-            if project.late_fee_enabled and project.days_overdue > 0:
-                # Option 1: Fixed daily rate
-                fee_by_day = daily_rate * project.days_overdue
-                
-                # Option 2: Percentage of total per day
-                fee_by_percentage = (project.total_amount * percentage / 100) * project.days_overdue
-                
-                # Use whichever is greater
-                project.late_fee_amount = max(fee_by_day, fee_by_percentage)
-            else:
-                project.late_fee_amount = 0.0
-    
+        method = IrConfigParam.get_param('rental.late_fee_calculation_method', 'maximum')
+        return daily_rate, percentage, method
+
+    @api.depends('days_overdue', 'late_fee_enabled', 'total_amount')
+    def _compute_late_fee(self):
+        daily_rate, percentage, method = self._get_late_fee_settings()
+
+        # Projects without late fees count as not overdue
+        days = [project.days_overdue if project.late_fee_enabled else 0 for project in self]
+        fees = compute_late_fees(self.mapped('total_amount'), days, daily_rate, percentage, method)
+
+        for project, fee in zip(self, fees):
+            project.late_fee_amount = fee
+
+    @api.model
+    def _cron_update_late_fees(self):
+        """Nightly sweep: refresh late fees of all overdue rentals in bulk"""
+        rows = self.search_read([
+            ('state', '=', 'ongoing'),
+            ('late_fee_enabled', '=', True),
+            ('end_date', '<', fields.Date.today()),
+        ], ['total_amount', 'days_overdue'])
+
+        if not rows:
+            return
+
+        daily_rate, percentage, method = self._get_late_fee_settings()
+        fees = compute_late_fees(
+            [row['total_amount'] for row in rows],
+            [row['days_overdue'] for row in rows],
+            daily_rate, percentage, method
+        )
+
+        # One UPDATE per distinct fee instead of one per project
+        ids_by_fee = defaultdict(list)
+        for row, fee in zip(rows, fees):
+            ids_by_fee[fee].append(row['id'])
+
+        for fee, project_ids in ids_by_fee.items():
+            self.browse(project_ids).write({'late_fee_amount': fee})
+
     def _compute_invoice_count(self):
         for project in self:
             project.invoice_count = 1 if project.invoice_id else 0
@@ -482,7 +501,7 @@ class RentalProject(models.Model):
             }
         }
 
-    @api.depends('item_ids.assigned_serial_ids.rental_charge')
+    @api.depends('item_ids.assigned_serial_ids.rental_charge', 'late_fee_amount', 'damage_fee', 'discount_amount')
     def _compute_amounts(self):
         """Recalculate total based on actual serial charges"""
         for project in self:
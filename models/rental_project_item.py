@@ -30,8 +30,7 @@ class RentalProjectItem(models.Model):
     project_state = fields.Selection(
         related='project_id.state',
         string='Project Status',
-        readonly=True,
-        store=True
+        readonly=True
     )
     
     # Equipment Information
@@ -49,7 +48,9 @@ class RentalProjectItem(models.Model):
     equipment_has_serials = fields.Boolean(
         'Has Serials',
         related='equipment_id.has_serials',
-        readonly=True
+        readonly=True,
+        store=True,
+        index=True
     )
     
     # Quantity and Serials
@@ -157,12 +158,21 @@ class RentalProjectItem(models.Model):
     @api.constrains('quantity', 'equipment_has_serials')
     def _check_serial_quantity_match(self):
         """Ensure assigned serials match quantity for serialized items"""
-        for item in self:
-            if item.equipment_has_serials and item.project_state not in ['draft', 'cancelled']:
-                if len(item.assigned_serial_ids) != item.quantity:
-                    raise ValidationError(_(
-                        'Number of assigned serials (%d) must match quantity (%d) for %s.'
-                    ) % (len(item.assigned_serial_ids), item.quantity, item.equipment_id.name))
+        # Only serialized items of confirmed projects are subject to the rule
+        records_to_check = self.filtered(
+            lambda r: r.equipment_has_serials and r.project_state not in ['draft', 'cancelled']
+        )
+        if not records_to_check:
+            return
+
+        # Prefetch the assigned serials of all items in one query
+        records_to_check.mapped('assigned_serial_ids')
+
+        for item in records_to_check:
+            if len(item.assigned_serial_ids) != item.quantity:
+                raise ValidationError(_(
+                    'Number of assigned serials (%d) must match quantity (%d) for %s.'
+                ) % (len(item.assigned_serial_ids), item.quantity, item.equipment_id.name))
     
     # Onchange Methods
     
@@ -216,7 +226,8 @@ class RentalProjectItem(models.Model):
     def _auto_assign_serials(self):
         """
         Automatically assign available serials to this item.
-        Called during draft state when quantity is set.
+        Called during draft state when quantity is set. On unsaved records
+        only existing serials are linked; missing ones are generated on reserve.
         """
         if not self.equipment_has_serials or not self.equipment_id:
             return
@@ -236,23 +247,27 @@ class RentalProjectItem(models.Model):
             return  # We have enough or too many
         
         # Get available serials (not already assigned to this item)
-        available_serials = self.equipment_id.serial_ids.filtered(
-            lambda s: s.status == 'available' and s.id not in current_assigned.ids
-        )
+        Serial = self.env['rental.equipment.serial']
+        available_domain = [
+            ('equipment_id', '=', self.equipment_id.id),
+            ('status', '=', 'available'),
+            ('id', 'not in', current_assigned.ids),
+        ]
+        available_serials = Serial.search(available_domain, limit=needed)
         
         if len(available_serials) < needed:
-            # Not enough available - check if we should auto-generate
-            if self.equipment_id.auto_generate_serials:
+            # Not enough available - check if we should auto-generate.
+            # Never create serials from an onchange (unsaved record): the user
+            # may still cancel, so generation is left to action_reserve_serials.
+            if self.equipment_id.auto_generate_serials and not isinstance(self.id, models.NewId):
                 shortage = needed - len(available_serials)
                 for i in range(shortage):
-                    self.env['rental.equipment.serial'].create({
+                    Serial.create({
                         'equipment_id': self.equipment_id.id,
                         'status': 'available'
                     })
                 # Refresh available serials
-                available_serials = self.equipment_id.serial_ids.filtered(
-                    lambda s: s.status == 'available' and s.id not in current_assigned.ids
-                )
+                available_serials = Serial.search(available_domain, limit=needed)
         
         # Assign serials (take first N available)
         serials_to_assign = available_serials[:needed]
@@ -281,7 +296,9 @@ class RentalProjectItem(models.Model):
         equipment = self.equipment_id
         
         # Get available serials
-        available_serials = equipment.serial_ids.filtered(lambda s: s.status == 'available')
+        Serial = self.env['rental.equipment.serial']
+        available_domain = [('equipment_id', '=', equipment.id), ('status', '=', 'available')]
+        available_serials = Serial.search(available_domain, limit=self.quantity)
         
         if len(available_serials) < self.quantity:
             # Check if we should auto-generate
@@ -289,12 +306,12 @@ class RentalProjectItem(models.Model):
                 # Generate missing serials
                 needed = self.quantity - len(available_serials)
                 for i in range(needed):
-                    self.env['rental.equipment.serial'].create({
+                    Serial.create({
                         'equipment_id': equipment.id,
                         'status': 'available'
                     })
                 # Re-fetch available serials
-                available_serials = equipment.serial_ids.filtered(lambda s: s.status == 'available')
+                available_serials = Serial.search(available_domain, limit=self.quantity)
             else:
                 raise UserError(_(
                     'Insufficient serials for %s. Need %d, found %d. Please add more serials or enable auto-generation.'
@@ -313,15 +330,14 @@ class RentalProjectItem(models.Model):
         self.assigned_serial_ids = [(6, 0, serials_to_assign.ids)]
         
         # Log status history
-        for serial in serials_to_assign:
-            self.env['rental.project.item.status'].create({
-                'project_id': self.project_id.id,
-                'equipment_id': self.equipment_id.id,
-                'serial_id': serial.id,
-                'quantity': 1,
-                'status': 'reserved',
-                'notes': f'Serial {serial.serial_number} reserved for project {self.project_id.name}'
-            })
+        self.env['rental.project.item.status'].create([{
+            'project_id': self.project_id.id,
+            'equipment_id': self.equipment_id.id,
+            'serial_id': serial.id,
+            'quantity': 1,
+            'status': 'reserved',
+            'notes': f'Serial {serial.serial_number} reserved for project {self.project_id.name}'
+        } for serial in serials_to_assign])
     
     def action_start_rental(self):
         """Change serial status from reserved to rented"""
@@ -333,15 +349,14 @@ class RentalProjectItem(models.Model):
         self.assigned_serial_ids.write({'status': 'rented'})
         
         # Log status change
-        for serial in self.assigned_serial_ids:
-            self.env['rental.project.item.status'].create({
-                'project_id': self.project_id.id,
-                'equipment_id': self.equipment_id.id,
-                'serial_id': serial.id,
-                'quantity': 1,
-                'status': 'rented',
-                'notes': f'Rental started for serial {serial.serial_number}'
-            })
+        self.env['rental.project.item.status'].create([{
+            'project_id': self.project_id.id,
+            'equipment_id': self.equipment_id.id,
+            'serial_id': serial.id,
+            'quantity': 1,
+            'status': 'rented',
+            'notes': f'Rental started for serial {serial.serial_number}'
+        } for serial in self.assigned_serial_ids])
     
     def action_complete_return(self):
         """Mark serials as returned and available"""
@@ -357,15 +372,14 @@ class RentalProjectItem(models.Model):
         })
         
         # Log return
-        for serial in self.assigned_serial_ids:
-            self.env['rental.project.item.status'].create({
-                'project_id': self.project_id.id,
-                'equipment_id': self.equipment_id.id,
-                'serial_id': serial.id,
-                'quantity': 1,
-                'status': 'returned',
-                'notes': f'Serial {serial.serial_number} returned'
-            })
+        self.env['rental.project.item.status'].create([{
+            'project_id': self.project_id.id,
+            'equipment_id': self.equipment_id.id,
+            'serial_id': serial.id,
+            'quantity': 1,
+            'status': 'returned',
+            'notes': f'Serial {serial.serial_number} returned'
+        } for serial in self.assigned_serial_ids])
         
         # Set to available after a brief moment (simulating inspection)
         # In real scenario, this might be done manually after inspection
@@ -401,10 +415,15 @@ class RentalProjectItem(models.Model):
         """Open wizard to manually select serials"""
         self.ensure_one()
         
-        # Get available serials for this equipment
-        available_serials = self.equipment_id.serial_ids.filtered(
-            lambda s: s.status == 'available' or s.id in self.assigned_serial_ids.ids
-        )
+        assigned_ids = self.assigned_serial_ids.ids
+        
+        # Get available serials for this equipment (filtered in SQL)
+        available_serial_ids = self.env['rental.equipment.serial'].search([
+            ('equipment_id', '=', self.equipment_id.id),
+            '|',
+            ('status', '=', 'available'),
+            ('id', 'in', assigned_ids)
+        ]).ids
         
         return {
             'type': 'ir.actions.act_window',
@@ -416,7 +435,7 @@ class RentalProjectItem(models.Model):
                 'default_project_item_id': self.id,
                 'default_equipment_id': self.equipment_id.id,
                 'default_quantity_needed': self.quantity,
-                'default_currently_assigned_ids': [(6, 0, self.assigned_serial_ids.ids)],
-                'available_serial_ids': available_serials.ids,
+                'default_currently_assigned_ids': [(6, 0, assigned_ids)],
+                'available_serial_ids': available_serial_ids,
             }
         }
\ No newline at end of file
@@ -9,7 +9,7 @@
 # Audit trail - Full history for compliance/disputes
 # Smart name_get - Shows equipment, serial, and status in displays
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 
 
 class RentalProjectItemStatus(models.Model):
@@ -104,14 +104,22 @@ class RentalProjectItemStatus(models.Model):
     ], string='Damage Severity')
     repair_cost_estimate = fields.Float('Estimated Repair Cost')
     
-    create_date = fields.Datetime('Date', readonly=True, index=True)
+    def init(self):
+        """Index the framework-managed create_date used by the default ordering"""
+        tools.create_index(
+            self._cr,
+            'rental_project_item_status_create_date_idx',
+            self._table,
+            ['create_date DESC']
+        )
     
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Auto-set user on creation"""
-        if 'user_id' not in vals:
-            vals['user_id'] = self.env.user.id
-        return super().create(vals)
+        for vals in vals_list:
+            if 'user_id' not in vals:
+                vals['user_id'] = self.env.user.id
+        return super().create(vals_list)
     
     def name_get(self):
         """Custom display name"""
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 
 
 class RentalScanLog(models.Model):
@@ -71,6 +71,15 @@ class RentalScanLog(models.Model):
         default=lambda self: self.env.company
     )
     
+    def init(self):
+        """Composite index matching the default 'scan_datetime desc' ordering"""
+        tools.create_index(
+            self._cr,
+            'rental_scan_log_recent_idx',
+            self._table,
+            ['scan_datetime DESC', 'scan_type']
+        )
+    
     @api.model
     def log_scan(self, serial_number_id, scan_type, project_id=None, 
                  notes=None, location=None, previous_status=None, new_status=None):
@@ -89,7 +98,7 @@ class RentalScanLog(models.Model):
         Returns:
             rental.scan.log: Created log record
         """
-        values = {
+        return self.log_scans([{
             'serial_number_id': serial_number_id,
             'scan_type': scan_type,
             'project_id': project_id,
@@ -97,9 +106,29 @@ class RentalScanLog(models.Model):
             'location': location,
             'previous_status': previous_status,
             'new_status': new_status,
-        }
+        }])
+    
+    @api.model
+    def log_scans(self, events):
+        """
+        Log several scan events with a single batched create
         
-        return self.create(values)
+        Args:
+            events (list): Dicts with the same keys as log_scan() arguments;
+                serial_number_id and scan_type are required
+            
+        Returns:
+            rental.scan.log: Created log records
+        """
+        return self.create([{
+            'serial_number_id': event['serial_number_id'],
+            'scan_type': event['scan_type'],
+            'project_id': event.get('project_id'),
+            'notes': event.get('notes'),
+            'location': event.get('location'),
+            'previous_status': event.get('previous_status'),
+            'new_status': event.get('new_status'),
+        } for event in events])
     
     def name_get(self):
         """Custom display name"""
@@ -54,24 +54,18 @@ class BulkSerialWizard(models.TransientModel):
         for wizard in self:
             if wizard.equipment_id and wizard.quantity > 0:
                 prefix = wizard.prefix_override or wizard.equipment_id.code or 'SN'
-                
-                # Get current highest number for this equipment
-                existing_serials = wizard.equipment_id.serial_ids
                 start = wizard.starting_number
                 
                 # Generate preview (show first 10 if more than 10)
-                preview_lines = []
                 preview_count = min(wizard.quantity, 10)
-                
-                for i in range(preview_count):
-                    serial_num = start + i
-                    serial_name = f"{prefix}-{serial_num:04d}"
-                    preview_lines.append(serial_name)
+                preview = "\n".join(
+                    f"{prefix}-{serial_num:04d}" for serial_num in range(start, start + preview_count)
+                )
                 
                 if wizard.quantity > 10:
-                    preview_lines.append(f"... and {wizard.quantity - 10} more")
+                    preview += f"\n... and {wizard.quantity - 10} more"
                 
-                wizard.preview_serials = "\n".join(preview_lines)
+                wizard.preview_serials = preview
             else:
                 wizard.preview_serials = "Enter quantity to see preview"
     
@@ -89,28 +83,29 @@ class BulkSerialWizard(models.TransientModel):
         start_num = self.starting_number
         
         # Check for existing serials to avoid duplicates
-        existing_serials = self.equipment_id.serial_ids.mapped('serial_number')
+        existing_serials = set(self.equipment_id.serial_ids.mapped('serial_number'))
+        
+        # Candidate serial names
+        candidates = [f"{prefix}-{start_num + i:04d}" for i in range(self.quantity)]
         
-        # Generate serials
-        created_serials = []
+        # Prepare serials
+        vals_list = []
         skipped = []
         
-        for i in range(self.quantity):
-            serial_num = start_num + i
-            serial_name = f"{prefix}-{serial_num:04d}"
-            
+        for serial_name in candidates:
             # Check if already exists
             if serial_name in existing_serials:
                 skipped.append(serial_name)
                 continue
             
-            # Create serial
-            serial = self.env['rental.equipment.serial'].create({
+            vals_list.append({
                 'equipment_id': self.equipment_id.id,
                 'serial_number': serial_name,
                 'status': 'available',
             })
-            created_serials.append(serial)
+        
+        # Create all serials in one batch
+        created_serials = self.env['rental.equipment.serial'].create(vals_list)
         
         # Show success message
         message = f"Successfully generated {len(created_serials)} serial number(s)."
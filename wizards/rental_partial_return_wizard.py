@@ -2,6 +2,7 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from collections import defaultdict
 
 
 class RentalPartialReturnWizard(models.TransientModel):
@@ -40,12 +41,24 @@ class RentalPartialReturnWizard(models.TransientModel):
 
     notes = fields.Text('Return Notes')
     # Overall assessment
-    has_damage = fields.Boolean('Has Damage')
+    has_damage = fields.Boolean(
+        'Has Damage',
+        compute='_compute_has_damage'
+    )
     total_damage_fee = fields.Float(
         'Total Damage Fee',
         compute='_compute_total_damage_fee'
     )
 
+    # Damage fee suggestions, read from settings once when the wizard opens
+    minor_threshold = fields.Float('Minor Damage Fee', readonly=True)
+    moderate_threshold = fields.Float('Moderate Damage Fee', readonly=True)
+
+    @api.depends('line_ids.condition')
+    def _compute_has_damage(self):
+        for wizard in self:
+            wizard.has_damage = any(line.condition != 'good' for line in wizard.line_ids)
+
     @api.depends('line_ids.damage_fee')
     def _compute_total_damage_fee(self):
         for wizard in self:
@@ -61,6 +74,10 @@ class RentalPartialReturnWizard(models.TransientModel):
         """Pre-populate with rented serials"""
         res = super().default_get(fields_list)
         
+        param = self.env['ir.config_parameter'].sudo()
+        res['minor_threshold'] = float(param.get_param('rental.damage_minor_threshold', 100))
+        res['moderate_threshold'] = float(param.get_param('rental.damage_moderate_threshold', 500))
+        
         project_id = self.env.context.get('default_project_id')
         if project_id:
             project = self.env['rental.project'].browse(project_id)
@@ -99,32 +116,50 @@ class RentalPartialReturnWizard(models.TransientModel):
                 'Return date cannot be after project end date (%s).'
             ) % self.project_id.end_date)
         
-                # Check if any items have damage
-        has_any_damage = any(line.condition != 'good' for line in self.line_ids)
-        
         # Update project with return information
         self.project_id.write({
             'damage_fee': self.total_damage_fee,
-            'has_damage': has_any_damage,  # NEW: Set has_damage flag
+            'has_damage': self.has_damage,
             'return_signature': self.return_signature,
             'return_photos': [(6, 0, self.return_photos.ids)]
         })
         
-        # Process each return
+        # Warm the cache for fields read while preparing each line
+        lines_to_return.mapped('serial_id.actual_pickup_date')
+        lines_to_return.mapped('equipment_id.daily_rate')
+        
+        # Prepare each return, grouping serials by their new status
+        serials_by_status = defaultdict(lambda: self.env['rental.equipment.serial'])
+        history_vals_list = []
         for line in lines_to_return:
-            line.action_process_return(self.return_date)
+            new_status, history_vals = line._prepare_return_vals(self.return_date)
+            serials_by_status[new_status] |= line.serial_id
+            history_vals_list.append(history_vals)
+        
+        # One write per target status
+        for new_status, serials in serials_by_status.items():
+            serial_vals = {
+                'status': new_status,
+                'actual_return_date': self.return_date,
+            }
+            if new_status in ['returned', 'disposed']:
+                serial_vals['current_project_id'] = False
+            serials.write(serial_vals)
+        
+        # Log status history in one batch
+        self.env['rental.project.item.status'].create(history_vals_list)
         
-        # Check if all items returned
-        remaining_rented = self.env['rental.equipment.serial'].search_count([
-            ('current_project_id', '=', self.project_id.id),
-            ('status', '=', 'rented')
-        ])
-        remaining_reserved = self.env['rental.equipment.serial'].search_count([
-            ('current_project_id', '=', self.project_id.id),
-            ('status', '=', 'reserved')
-        ])
+        # Check if all items returned: count remaining serials per status in one query
+        counts = {
+            group['status']: group['status_count']
+            for group in self.env['rental.equipment.serial'].read_group(
+                [('current_project_id', '=', self.project_id.id), ('status', 'in', ['rented', 'reserved'])],
+                ['status'],
+                ['status']
+            )
+        }
         
-        if remaining_rented == 0 and remaining_reserved == 0:
+        if counts.get('rented', 0) == 0 and counts.get('reserved', 0) == 0:
             # All returned - mark project as returned
             self.project_id.write({
                 'state': 'returned',
@@ -198,10 +233,11 @@ class RentalPartialReturnWizardLine(models.TransientModel):
     @api.depends('pickup_date', 'wizard_id.return_date', 'daily_rate', 'to_return')
     def _compute_rental_info(self):
         for line in self:
-            if line.to_return and line.pickup_date and line.wizard_id.return_date:
-                delta = line.wizard_id.return_date - line.pickup_date
-                line.rental_days = delta.days + 1
-                line.rental_charge = line.rental_days * line.daily_rate
+            return_date = line.wizard_id.return_date
+            if line.to_return and line.pickup_date and return_date:
+                days = (return_date - line.pickup_date).days + 1
+                line.rental_days = days
+                line.rental_charge = days * line.daily_rate
             else:
                 line.rental_days = 0
                 line.rental_charge = 0.0
@@ -212,24 +248,23 @@ class RentalPartialReturnWizardLine(models.TransientModel):
         if self.condition == 'good':
             self.damage_fee = 0.0
         elif self.condition == 'minor_damage':
-            # Suggest minor damage fee from settings
-            param = self.env['ir.config_parameter'].sudo()
-            self.damage_fee = float(param.get_param('rental.damage_minor_threshold', 100))
+            # Suggest minor damage fee from settings (cached on the wizard)
+            self.damage_fee = self.wizard_id.minor_threshold
         elif self.condition == 'damaged':
-            # Suggest moderate damage fee from settings
-            param = self.env['ir.config_parameter'].sudo()
-            self.damage_fee = float(param.get_param('rental.damage_moderate_threshold', 500))
+            # Suggest moderate damage fee from settings (cached on the wizard)
+            self.damage_fee = self.wizard_id.moderate_threshold
         elif self.condition == 'lost':
             # Suggest full equipment value
             if self.equipment_id:
                 self.damage_fee = self.equipment_id.item_value or 1000.0
-
-        # Update wizard's has_damage flag
-        if self.condition != 'good':
-            self.wizard_id.has_damage = True
     
-    def action_process_return(self, return_date):
-        """Process this return line"""
+    def _prepare_return_vals(self, return_date):
+        """
+        Prepare the return of this line without writing anything
+        
+        Returns:
+            tuple: (new serial status, status history values)
+        """
         self.ensure_one()
         
         # Determine new status
@@ -242,19 +277,7 @@ class RentalPartialReturnWizardLine(models.TransientModel):
         else:  # lost
             new_status = 'disposed'
         
-        # Update serial
-        self.serial_id.write({
-            'status': new_status,
-            'actual_return_date': return_date,
-            'current_project_id': False if new_status in ['returned', 'disposed'] else self.serial_id.current_project_id.id
-        })
-        
-        # Update wizard's has_damage flag
-        if self.condition != 'good':
-            self.wizard_id.has_damage = True
-
-        # Log status history
-        self.env['rental.project.item.status'].create({
+        history_vals = {
             'project_id': self.wizard_id.project_id.id,
             'equipment_id': self.equipment_id.id,
             'serial_id': self.serial_id.id,
@@ -263,4 +286,6 @@ class RentalPartialReturnWizardLine(models.TransientModel):
             'damage_description': self.damage_description,
             'damage_severity': 'minor' if self.condition == 'minor_damage' else 'severe' if self.condition in ['damaged', 'lost'] else None,
             'repair_cost_estimate': self.damage_fee
-        })
\ No newline at end of file
+        }
+        
+        return new_status, history_vals
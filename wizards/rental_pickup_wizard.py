@@ -67,20 +67,20 @@ class RentalPickupWizard(models.TransientModel):
             ) % self.project_id.end_date)
         
         # Update serials
-        for serial in self.serial_ids:
-            serial.write({
-                'status': 'rented',
-                'actual_pickup_date': self.pickup_date
-            })
-            
-            # Log pickup in status history
-            self.env['rental.project.item.status'].create({
-                'project_id': self.project_id.id,
-                'equipment_id': serial.equipment_id.id,
-                'serial_id': serial.id,
-                'status': 'rented',
-                'notes': f'Picked up on {self.pickup_date}. {self.notes or ""}'
-            })
+        self.serial_ids.write({
+            'status': 'rented',
+            'actual_pickup_date': self.pickup_date
+        })
+        
+        # Log pickup in status history
+        notes = f'Picked up on {self.pickup_date}. {self.notes or ""}'
+        self.env['rental.project.item.status'].create([{
+            'project_id': self.project_id.id,
+            'equipment_id': serial.equipment_id.id,
+            'serial_id': serial.id,
+            'status': 'rented',
+            'notes': notes
+        } for serial in self.serial_ids])
         
         # Update project state if first pickup
         if self.project_id.state == 'reserved':
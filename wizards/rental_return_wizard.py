@@ -11,8 +11,27 @@
 # Smart defaults - Pre-populate with project items
 # Total calculation - Sum all damage fees
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
+from collections import defaultdict
+
+import logging
+_logger = logging.getLogger(__name__)
+
+# Return condition -> new serial status
+_COND_TO_STATUS = {
+    'good': 'returned',
+    'minor_damage': 'damaged',
+    'damaged': 'repairing',
+    'lost': 'disposed',
+}
+
+# Return condition -> damage severity logged in status history
+_COND_TO_SEVERITY = {
+    'minor_damage': 'minor',
+    'damaged': 'severe',
+    'lost': 'severe',
+}
 
 
 class RentalReturnWizard(models.TransientModel):
@@ -39,7 +58,10 @@ class RentalReturnWizard(models.TransientModel):
     )
 
     # Overall assessment
-    has_damage = fields.Boolean('Has Damage')
+    has_damage = fields.Boolean(
+        'Has Damage',
+        compute='_compute_has_damage'
+    )
     total_damage_fee = fields.Float(
         'Total Damage Fee',
         compute='_compute_total_damage_fee'
@@ -57,6 +79,15 @@ class RentalReturnWizard(models.TransientModel):
 
     notes = fields.Text('Return Notes')
 
+    # Damage fee suggestions, read from settings once when the wizard opens
+    minor_threshold = fields.Float('Minor Damage Fee', readonly=True)
+    moderate_threshold = fields.Float('Moderate Damage Fee', readonly=True)
+
+    @api.depends('item_line_ids.condition')
+    def _compute_has_damage(self):
+        for wizard in self:
+            wizard.has_damage = any(line.condition != 'good' for line in wizard.item_line_ids)
+
     @api.depends('item_line_ids.damage_fee')
     def _compute_total_damage_fee(self):
         for wizard in self:
@@ -67,25 +98,32 @@ class RentalReturnWizard(models.TransientModel):
         """Populate wizard with project items"""
         res = super().default_get(fields_list)
         
+        param = self.env['ir.config_parameter'].sudo()
+        res['minor_threshold'] = float(param.get_param('rental.damage_minor_threshold', 100))
+        res['moderate_threshold'] = float(param.get_param('rental.damage_moderate_threshold', 500))
+        
         project_id = self.env.context.get('default_project_id') or self.env.context.get('active_id')
         if project_id:
             project = self.env['rental.project'].browse(project_id)
             res['project_id'] = project.id
             
+            # Load items' equipment and serials in one query per relation
+            items = project.item_ids
+            items.mapped('equipment_id')
+            items.mapped('assigned_serial_ids')
+            
             # Create lines for each item in the project
             lines = []
-            for item in project.item_ids:
+            for item in items:
                 # Create a line for each assigned serial
                 if item.equipment_has_serials and item.assigned_serial_ids:
-                    for serial in item.assigned_serial_ids:
-                        line_vals = {
-                            'equipment_id': item.equipment_id.id,
-                            'serial_id': serial.id,  # Explicitly set serial_id
-                            'quantity': 1,
-                            'condition': 'good',
-                            'damage_fee': 0.0
-                        }
-                        lines.append((0, 0, line_vals))
+                    lines.extend((0, 0, {
+                        'equipment_id': item.equipment_id.id,
+                        'serial_id': serial.id,  # Explicitly set serial_id
+                        'quantity': 1,
+                        'condition': 'good',
+                        'damage_fee': 0.0
+                    }) for serial in item.assigned_serial_ids)
                 else:
                     # For non-serialized items, create one line
                     line_vals = {
@@ -101,38 +139,68 @@ class RentalReturnWizard(models.TransientModel):
         
         return res
 
+    @api.model
+    @tools.ormcache()
+    def _todo_activity_type_id(self):
+        """To-do activity type id, resolved once per registry"""
+        return self.env.ref('mail.mail_activity_data_todo').id
+
     def action_complete_return(self):
         """Complete the return process"""
         self.ensure_one()
+        project = self.project_id
+        total_damage_fee = self.total_damage_fee
+        has_damage = self.has_damage
         
-        # Check if any items have damage
-        has_any_damage = any(line.condition != 'good' for line in self.item_line_ids)
-        
-        # Update project with return information
-        self.project_id.write({
+        # Update project with return information (only the photo difference is relinked)
+        current_photos = set(project.return_photos.ids)
+        selected_photos = set(self.return_photos.ids)
+        photo_commands = [(3, photo_id) for photo_id in current_photos - selected_photos]
+        photo_commands += [(4, photo_id) for photo_id in selected_photos - current_photos]
+        project.write({
             'actual_return_date': self.actual_return_date,
-            'damage_fee': self.total_damage_fee,
-            'has_damage': has_any_damage,  # NEW: Set has_damage flag
+            'damage_fee': total_damage_fee,
+            'has_damage': has_damage,
             'return_signature': self.return_signature,
-            'return_photos': [(6, 0, self.return_photos.ids)]
+            'return_photos': photo_commands,
         })
         
-        # Process each return line
-        for line in self.item_line_ids:
-            line.action_process_return()
+        # Prepare each serialized return line, grouping serials by their new status
+        lines = self.item_line_ids
+        notes_template = _("Returned in %s condition")
+        serials_by_status = defaultdict(lambda: self.env['rental.equipment.serial'])
+        history_vals_list = []
+        for line in lines.filtered('serial_id'):
+            new_status, history_vals = line._prepare_return_vals(notes_template)
+            serials_by_status[new_status] |= line.serial_id
+            history_vals_list.append(history_vals)
+        
+        # One write per target status
+        for new_status, serials in serials_by_status.items():
+            serials.write({
+                'status': new_status,
+                'current_project_id': False if new_status in ['returned', 'disposed'] else project.id
+            })
+            _logger.info("Updated %d serial(s) status to: %s", len(serials), new_status)
+        
+        # Create status history in one batch
+        if history_vals_list:
+            self.env['rental.project.item.status'].create(history_vals_list)
+            _logger.info("Created %d status history entries for project %s",
+                         len(history_vals_list), project.name)
         
         # Mark project as returned
-        self.project_id.action_complete_return()
+        project.action_complete_return()
         
         # If has damage, create activity for follow-up
-        if has_any_damage or self.total_damage_fee > 0:
-            self.project_id.activity_schedule(
-                'mail.mail_activity_data_todo',
+        if has_damage or total_damage_fee > 0:
+            project.activity_schedule(
+                activity_type_id=self._todo_activity_type_id(),
                 summary=_('Follow up on damaged equipment'),
                 note=_('Equipment returned with damage. Total damage fee: %s. Notes: %s') % (
-                    self.total_damage_fee, self.notes or 'None'
+                    total_damage_fee, self.notes or 'None'
                 ),
-                user_id=self.env.user.id
+                user_id=self.env.uid
             )
         
         # return {
@@ -152,6 +220,9 @@ class RentalReturnWizardLine(models.TransientModel):
     _name = 'rental.return.wizard.line'
     _description = 'Return Wizard Line'
 
+    # Filled lazily by _get_condition_labels()
+    _condition_labels = None
+
     wizard_id = fields.Many2one(
         'rental.return.wizard',
         string='Wizard',
@@ -165,23 +236,11 @@ class RentalReturnWizardLine(models.TransientModel):
         required=True
     )
 
-    equipment_name = fields.Char(
-        string='Equipment Name',
-        related='equipment_id.name',
-        readonly=True
-    )
-
     serial_id = fields.Many2one(
         'rental.equipment.serial',
         string='Serial Number'
     )
 
-    serial_number = fields.Char(
-        string='Serial',
-        related='serial_id.serial_number',
-        readonly=True
-    )
-
     quantity = fields.Integer('Quantity', default=1)
 
     # Return assessment
@@ -207,85 +266,66 @@ class RentalReturnWizardLine(models.TransientModel):
     @api.onchange('condition')
     def _onchange_condition(self):
         """Auto-fill damage fee based on condition and settings"""
-        if self.condition == 'good':
-            self.damage_fee = 0.0
-        elif self.condition == 'minor_damage':
-            # Suggest minor damage fee from settings
-            param = self.env['ir.config_parameter'].sudo()
-            self.damage_fee = float(param.get_param('rental.damage_minor_threshold', 100))
-        elif self.condition == 'damaged':
-            # Suggest moderate damage fee from settings
-            param = self.env['ir.config_parameter'].sudo()
-            self.damage_fee = float(param.get_param('rental.damage_moderate_threshold', 500))
-        elif self.condition == 'lost':
-            # Suggest full equipment value
-            if self.equipment_id:
-                self.damage_fee = self.equipment_id.item_value or 1000.0
+        # Settings thresholds are cached on the wizard; lost suggests the full equipment value
+        fees = {
+            'good': 0.0,
+            'minor_damage': self.wizard_id.minor_threshold,
+            'damaged': self.wizard_id.moderate_threshold,
+        }
+        if self.equipment_id:
+            fees['lost'] = self.equipment_id.item_value or 1000.0
+        
+        if self.condition in fees:
+            self.damage_fee = fees[self.condition]
 
-        # Update wizard's has_damage flag
-        if self.condition != 'good':
-            self.wizard_id.has_damage = True
+    @api.model
+    def _get_condition_labels(self):
+        """Condition selection labels, built once per registry"""
+        cls = type(self)
+        if cls._condition_labels is None:
+            cls._condition_labels = dict(self._fields['condition'].selection)
+        return cls._condition_labels
 
-    def action_process_return(self):
-        """Process this return line"""
+    def _prepare_return_vals(self, notes_template):
+        """
+        Prepare the return of this serialized line without writing anything
+        
+        Args:
+            notes_template (str): Translated "Returned in %s condition" template, built once by the caller
+            
+        Returns:
+            tuple: (new serial status, status history values)
+        """
         self.ensure_one()
         
-        # Debug log
-        import logging
-        _logger = logging.getLogger(__name__)
-        _logger.info(f"Processing return for equipment: {self.equipment_id.name}, serial: {self.serial_id.serial_number if self.serial_id else 'None'}, condition: {self.condition}")
+        # Determine new status based on condition
+        new_status = _COND_TO_STATUS.get(self.condition, 'returned')
         
-        if self.serial_id:
-            # Determine new status based on condition
-            if self.condition == 'good':
-                new_status = 'returned'
-            elif self.condition == 'minor_damage':
-                new_status = 'damaged'
-            elif self.condition == 'damaged':
-                new_status = 'repairing'
-            elif self.condition == 'lost':
-                new_status = 'disposed'
-            else:
-                new_status = 'returned'
-            
-            # Update serial status
-            self.serial_id.write({
-                'status': new_status,
-                'current_project_id': False if new_status in ['returned', 'disposed'] else self.wizard_id.project_id.id
-            })
-            
-            _logger.info(f"Updated serial {self.serial_id.serial_number} status to: {new_status}")
-            
-            # Determine damage severity
-            damage_severity = None
-            if self.condition == 'minor_damage':
-                damage_severity = 'minor'
-            elif self.condition in ['damaged', 'lost']:
-                damage_severity = 'severe'
-            
-            # Create detailed status history entry
-            condition_label = dict(self._fields['condition'].selection).get(self.condition)
-            notes = f"Returned in {condition_label} condition"
-            if self.damage_description:
-                notes += f"\nDetails: {self.damage_description}"
-            if self.damage_fee > 0:
-                notes += f"\nDamage fee: ${self.damage_fee}"
-            
-            # Create status history
-            self.env['rental.project.item.status'].create({
-                'project_id': self.wizard_id.project_id.id,
-                'equipment_id': self.equipment_id.id,
-                'serial_id': self.serial_id.id,
-                'status': new_status,
-                'notes': notes,
-                'damage_description': self.damage_description,
-                'damage_severity': damage_severity,
-                'repair_cost_estimate': self.damage_fee if self.damage_fee > 0 else 0.0,
-                'photo_ids': [(6, 0, self.photo_ids.ids)] if self.photo_ids else False
-            })
-            
-            _logger.info(f"Created status history for serial {self.serial_id.serial_number}")
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("Processing return for serial %s, condition: %s, new status: %s",
+                          self.serial_id.serial_number, self.condition, new_status)
+        
+        # Determine damage severity
+        damage_severity = _COND_TO_SEVERITY.get(self.condition)
+        
+        # Create detailed status history entry
+        notes = notes_template % self._get_condition_labels().get(self.condition)
+        if self.damage_description:
+            notes += f"\nDetails: {self.damage_description}"
+        if self.damage_fee > 0:
+            notes += f"\nDamage fee: ${self.damage_fee}"
+        
+        history_vals = {
+            'project_id': self.wizard_id.project_id.id,
+            'equipment_id': self.equipment_id.id,
+            'serial_id': self.serial_id.id,
+            'status': new_status,
+            'notes': notes,
+            'damage_description': self.damage_description,
+            'damage_severity': damage_severity,
+            'repair_cost_estimate': self.damage_fee if self.damage_fee > 0 else 0.0,
+        }
+        if self.photo_ids:
+            history_vals['photo_ids'] = [(6, 0, self.photo_ids.ids)]
         
-        # Update wizard's has_damage flag
-        if self.condition != 'good':
-            self.wizard_id.has_damage = True
\ No newline at end of file
+        return new_status, history_vals
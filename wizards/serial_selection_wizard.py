@@ -48,25 +48,22 @@ class SerialSelectionWizard(models.TransientModel):
     
     selected_count = fields.Integer(
         string='Selected',
-        compute='_compute_selected_count'
+        compute='_compute_selected_and_warning'
     )
     
     warning_message = fields.Char(
         string='Warning',
-        compute='_compute_warning'
+        compute='_compute_selected_and_warning'
     )
     
-    @api.depends('available_serial_ids')
-    def _compute_selected_count(self):
-        for wizard in self:
-            wizard.selected_count = len(wizard.available_serial_ids)
-    
     @api.depends('available_serial_ids', 'quantity_needed')
-    def _compute_warning(self):
+    def _compute_selected_and_warning(self):
         for wizard in self:
             selected = len(wizard.available_serial_ids)
             needed = wizard.quantity_needed
             
+            wizard.selected_count = selected
+            
             if selected < needed:
                 wizard.warning_message = f'⚠️ You selected {selected} serials but need {needed}. Please select {needed - selected} more.'
             elif selected > needed:
@@ -91,23 +88,28 @@ class SerialSelectionWizard(models.TransientModel):
         """Assign the selected serials to the project item"""
         self.ensure_one()
         
+        selected_ids = self.available_serial_ids.ids
+        
         # Validate selection count matches quantity needed
-        if len(self.available_serial_ids) != self.quantity_needed:
+        if len(selected_ids) != self.quantity_needed:
             raise ValidationError(_(
                 'You must select exactly %d serial(s). You selected %d.'
-            ) % (self.quantity_needed, len(self.available_serial_ids)))
+            ) % (self.quantity_needed, len(selected_ids)))
         
-        # Update project item with selected serials
-        self.project_item_id.write({
-            'assigned_serial_ids': [(6, 0, self.available_serial_ids.ids)]
-        })
+        # Update project item with selected serials, unlinking/linking only the difference
+        current = set(self.project_item_id.assigned_serial_ids.ids)
+        selected = set(selected_ids)
+        commands = [(3, serial_id) for serial_id in current - selected]
+        commands += [(4, serial_id) for serial_id in selected - current]
+        if commands:
+            self.project_item_id.write({'assigned_serial_ids': commands})
         
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': _('Serials Assigned'),
-                'message': _('%d serial number(s) successfully assigned.') % len(self.available_serial_ids),
+                'message': _('%d serial number(s) successfully assigned.') % len(selected_ids),
                 'type': 'success',
                 'sticky': False,
                 'next': {
@@ -120,10 +122,12 @@ class SerialSelectionWizard(models.TransientModel):
         """Automatically assign available serials"""
         self.ensure_one()
         
-        # Get available serials
-        available = self.equipment_id.serial_ids.filtered(
-            lambda s: s.status == 'available'
-        )
+        # Get the first N available serials (filtered and limited in SQL).
+        # Fewer than N results means that is the exact available count.
+        available = self.env['rental.equipment.serial'].search([
+            ('equipment_id', '=', self.equipment_id.id),
+            ('status', '=', 'available')
+        ], limit=self.quantity_needed)
         
         if len(available) < self.quantity_needed:
             raise ValidationError(_(
@@ -132,7 +136,7 @@ class SerialSelectionWizard(models.TransientModel):
             ) % (self.quantity_needed, len(available)))
         
         # Auto-select first N available
-        self.available_serial_ids = [(6, 0, available[:self.quantity_needed].ids)]
+        self.available_serial_ids = [(6, 0, available.ids)]
         
     # IMPORTANT: Return action to reload the form with updated values
         return {